@@ -3,59 +3,100 @@ Configuration settings for the RAG chatbot backend.
 Loads environment variables and provides configuration constants.
 """
 import os
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
 
-# Base directory
-BASE_DIR = Path(__file__).parent
+class Settings:
+    """All configuration, parsed from the environment exactly once."""
 
-# Pinecone Configuration
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
+    def __init__(self):
+        # Load environment variables from .env file
+        load_dotenv()
 
-# Embedding Configuration
-EMBEDDING_DIMENSION = 384  # Dimension for Cohere embed-english-light-v3.0
+        # Base directory
+        self.BASE_DIR = Path(__file__).parent
 
-# File Upload Configuration
-# Use /tmp for serverless/container environments (Render, Vercel, etc.)
-UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "/tmp/uploads"))
-# Create the upload directory only if the runtime allows writes (e.g., /tmp on Vercel/Render)
-if not UPLOAD_DIR.exists():
+        # Pinecone Configuration
+        self.PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+        self.PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
+
+        # Embedding Configuration
+        self.EMBEDDING_DIMENSION = 384  # Dimension for Cohere embed-english-light-v3.0
+
+        # File Upload Configuration
+        # Use /tmp for serverless/container environments (Render, Vercel, etc.)
+        # The directory itself is created lazily by ensure_upload_dir()
+        self.UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "/tmp/uploads"))
+        self.MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", 4718592))  # 4.5MB for Vercel serverless
+
+        # Text Chunking Configuration
+        self.CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 800))
+        self.CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 100))
+
+        # Database Configuration
+        # Use /tmp for serverless/container environments
+        self.DATABASE_PATH = Path(os.getenv("DATABASE_PATH", "/tmp/chat_history.db"))
+        # On ephemeral filesystems (Render/Vercel /tmp) journal fsyncs buy
+        # no durability; this flag trades crash safety for write speed.
+        # DATABASE_PATH=":memory:" runs fully stateless.
+        self.SQLITE_EPHEMERAL = os.getenv("SQLITE_EPHEMERAL", "").lower() in ("1", "true", "yes")
+        # Semantic query cache spill file; lets restarted workers start warm
+        self.SEMANTIC_CACHE_PATH = Path(os.getenv("SEMANTIC_CACHE_PATH", "/tmp/semantic_cache.db"))
+
+        # Appwrite Configuration
+        self.APPWRITE_ENDPOINT = os.getenv("APPWRITE_ENDPOINT", "https://cloud.appwrite.io/v1")
+        self.APPWRITE_PROJECT_ID = os.getenv("APPWRITE_PROJECT_ID")
+        self.APPWRITE_API_KEY = os.getenv("APPWRITE_API_KEY")
+        self.APPWRITE_DATABASE_ID = os.getenv("APPWRITE_DATABASE_ID", "chat-db")
+        self.APPWRITE_COLLECTION_ID = os.getenv("APPWRITE_COLLECTION_ID", "chat-history")
+        self.APPWRITE_BUCKET_ID = os.getenv("APPWRITE_BUCKET_ID", "pdf-storage")
+        # Marker file recording that the Appwrite database/collections/
+        # bucket bootstrap has already run on this filesystem
+        self.APPWRITE_BOOTSTRAP_MARKER = Path(os.getenv(
+            "APPWRITE_BOOTSTRAP_MARKER", "/tmp/.appwrite-bootstrap"))
+
+        # API Configuration
+        self.API_HOST = os.getenv("API_HOST", "0.0.0.0")
+        self.API_PORT = int(os.getenv("API_PORT", 8001))
+
+        # CORS Configuration
+        # Add your frontend domain here
+        self.CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:3001,http://127.0.0.1:3000,http://127.0.0.1:3001,http://0.0.0.0:8001,https://ai-chat-bot.appwrite.network").split(",")
+
+        # Retrieval Configuration
+        self.DEFAULT_TOP_K = int(os.getenv("DEFAULT_TOP_K", 5))
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide Settings instance."""
+    return Settings()
+
+
+def ensure_upload_dir() -> Path:
+    """Create the upload directory if needed and return its path.
+
+    Called lazily from the upload path instead of at import time, so cold
+    starts (and read-only runtimes) don't pay or fail the mkdir probe.
+    """
+    settings = get_settings()
+    if not settings.UPLOAD_DIR.exists():
+        try:
+            settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            # In read‑only environments the directory may not be creatable; fallback to /tmp
+            print(f"Warning: could not create upload dir {settings.UPLOAD_DIR}: {e}")
+            settings.UPLOAD_DIR = Path("/tmp/uploads")
+            settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    return settings.UPLOAD_DIR
+
+
+def __getattr__(name):
+    """Keep `config.CONSTANT` working by delegating to the cached Settings."""
+    settings = get_settings()
     try:
-        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    except Exception as e:
-        # In read‑only environments the directory may not be creatable; fallback to /tmp
-        print(f"Warning: could not create upload dir {UPLOAD_DIR}: {e}")
-        UPLOAD_DIR = Path("/tmp/uploads")
-        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", 4718592))  # 4.5MB for Vercel serverless
-
-# Text Chunking Configuration
-CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 800))
-CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 100))
-
-# Database Configuration
-# Use /tmp for serverless/container environments
-DATABASE_PATH = Path(os.getenv("DATABASE_PATH", "/tmp/chat_history.db"))
-
-# Appwrite Configuration
-APPWRITE_ENDPOINT = os.getenv("APPWRITE_ENDPOINT", "https://cloud.appwrite.io/v1")
-APPWRITE_PROJECT_ID = os.getenv("APPWRITE_PROJECT_ID")
-APPWRITE_API_KEY = os.getenv("APPWRITE_API_KEY")
-APPWRITE_DATABASE_ID = os.getenv("APPWRITE_DATABASE_ID", "chat-db")
-APPWRITE_COLLECTION_ID = os.getenv("APPWRITE_COLLECTION_ID", "chat-history")
-APPWRITE_BUCKET_ID = os.getenv("APPWRITE_BUCKET_ID", "pdf-storage")
-
-# API Configuration
-API_HOST = os.getenv("API_HOST", "0.0.0.0")
-API_PORT = int(os.getenv("API_PORT", 8001))
-
-# CORS Configuration
-# Add your frontend domain here
-CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:3001,http://127.0.0.1:3000,http://127.0.0.1:3001,http://0.0.0.0:8001,https://ai-chat-bot.appwrite.network").split(",")
-
-# Retrieval Configuration
-DEFAULT_TOP_K = int(os.getenv("DEFAULT_TOP_K", 5))
+        return getattr(settings, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
@@ -1,145 +1,396 @@
 """
 SQLite database initialization and management for chat history.
 """
+import os
 import sqlite3
-import json
+import orjson
+import queue
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
 from pathlib import Path
 import config
 
 
+# SQL statements are module-level constants so that every execute() passes
+# the identical string object, letting sqlite3's per-connection statement
+# cache reuse the compiled statement instead of re-parsing the SQL.
+_SQL_INSERT_MESSAGE = """
+    INSERT INTO chat_history (session_id, message_type, content, metadata)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Single-row variant hands the new id back in the same statement;
+# executemany (used for batches) does not support RETURNING
+_SQL_INSERT_MESSAGE_RETURNING = """
+    INSERT INTO chat_history (session_id, message_type, content, metadata)
+    VALUES (?, ?, ?, ?)
+    RETURNING id
+"""
+
+# Listing endpoints rarely need the metadata payload, so the default
+# SELECT omits the column entirely and a _WITH_META variant opts in.
+_SQL_SELECT_HISTORY_BY_SESSION = """
+    SELECT id, session_id, message_type, content, timestamp
+    FROM chat_history
+    WHERE session_id = ?
+    ORDER BY timestamp ASC
+"""
+
+_SQL_SELECT_HISTORY_BY_SESSION_WITH_META = """
+    SELECT id, session_id, message_type, content, timestamp, metadata
+    FROM chat_history
+    WHERE session_id = ?
+    ORDER BY timestamp ASC
+"""
+
+# Newest-first variants: combined with LIMIT these return the *recent*
+# end of a session's history (id is the monotonic INTEGER PRIMARY KEY)
+_SQL_SELECT_HISTORY_BY_SESSION_DESC = """
+    SELECT id, session_id, message_type, content, timestamp
+    FROM chat_history
+    WHERE session_id = ?
+    ORDER BY id DESC
+"""
+
+_SQL_SELECT_HISTORY_BY_SESSION_DESC_WITH_META = """
+    SELECT id, session_id, message_type, content, timestamp, metadata
+    FROM chat_history
+    WHERE session_id = ?
+    ORDER BY id DESC
+"""
+
+# Newest-first over all sessions: id is the monotonic INTEGER PRIMARY KEY,
+# so ordering by it walks the table b-tree backwards with no sort step.
+_SQL_SELECT_HISTORY_ALL = """
+    SELECT id, session_id, message_type, content, timestamp
+    FROM chat_history
+    ORDER BY id DESC
+"""
+
+_SQL_SELECT_HISTORY_ALL_WITH_META = """
+    SELECT id, session_id, message_type, content, timestamp, metadata
+    FROM chat_history
+    ORDER BY id DESC
+"""
+
+_SQL_DELETE_MESSAGES = "DELETE FROM chat_history WHERE session_id = ?"
+
+# Timestamps come from the engine defaults; RETURNING hands back the
+# canonical row in the same statement (SQLite >= 3.35)
+_SQL_INSERT_SESSION = """
+    INSERT INTO sessions (id, name, mode, pdf_id)
+    VALUES (?, ?, ?, ?)
+    RETURNING created_at, updated_at
+"""
+
+_SQL_SELECT_ALL_SESSIONS = """
+    SELECT * FROM sessions
+    ORDER BY updated_at DESC
+"""
+
+_SQL_SELECT_SESSION = "SELECT * FROM sessions WHERE id = ?"
+
+_SQL_DELETE_SESSION = "DELETE FROM sessions WHERE id = ?"
+
+_SQL_UPDATE_SESSION_TIMESTAMP = """
+    UPDATE sessions
+    SET updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+    WHERE id = ?
+"""
+
+
+class _ConnectionPool:
+    """Process-lifetime pool of SQLite connections: one writer + N readers.
+
+    SQLite allows many concurrent readers but only one writer, so the pool
+    keeps a single serialized write connection and a small queue of read
+    connections. Connections are opened once and reused, avoiding the
+    per-request open/close of the database file.
+    """
+
+    def __init__(self, db_path: Path, num_readers: Optional[int] = None):
+        if num_readers is None:
+            # Readers run on worker threads; past the core count extra
+            # connections only add cache duplication
+            num_readers = min(8, os.cpu_count() or 4)
+        self.db_path = db_path
+        # A ":memory:" database exists per-connection, so the pool collapses
+        # to the single writer connection shared by readers too
+        self._in_memory = str(db_path) == ":memory:"
+        self._writer = self._create_connection()
+        self._writer_lock = threading.Lock()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        if not self._in_memory:
+            for _ in range(num_readers):
+                self._readers.put(self._create_connection())
+
+    def _create_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        if self._in_memory or config.SQLITE_EPHEMERAL:
+            # Nothing to preserve across a crash on an ephemeral /tmp
+            # database, so skip journal pages and fsyncs entirely
+            conn.execute("PRAGMA journal_mode=MEMORY")
+            conn.execute("PRAGMA synchronous=OFF")
+        else:
+            # WAL lets readers proceed while a write is in flight, and
+            # synchronous=NORMAL drops the per-INSERT fsync (safe in WAL mode).
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-30000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA busy_timeout=5000")
+        # foreign_keys stays off (the SQLite default): a database file
+        # created by the pre-FK schema cannot gain the constraint via
+        # CREATE TABLE IF NOT EXISTS, and enforcing it only on fresh
+        # files would also start rejecting message saves for session ids
+        # that have no sessions row, which the API accepts
+        return conn
+
+    @contextmanager
+    def acquire(self, readonly: bool = False):
+        """Check out a connection for the duration of a with-block."""
+        if readonly and not self._in_memory:
+            conn = self._readers.get()
+            try:
+                yield conn
+            finally:
+                self._readers.put(conn)
+        else:
+            with self._writer_lock:
+                yield self._writer
+
+    def close(self):
+        """Close every pooled connection; used at lifespan shutdown."""
+        with self._writer_lock:
+            self._writer.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
 class ChatDatabase:
     """Manages SQLite database for chat history."""
-    
+
     def __init__(self, db_path: Path = config.DATABASE_PATH):
         self.db_path = db_path
+        self._pool = _ConnectionPool(db_path)
+        # Sessions are read-hot and write-cold: cache individual rows and
+        # the full listing in-process, invalidating on writes
+        self._session_cache: Dict[str, Dict[str, Any]] = {}
+        self._sessions_listing: Optional[List[Dict[str, Any]]] = None
+        self._cache_lock = threading.Lock()
         self.init_database()
-    
+
     def init_database(self):
         """Initialize the database and create tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Chat history table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS chat_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                message_type TEXT NOT NULL,
-                content TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                metadata TEXT
-            )
-        """)
-        
-        # Sessions table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sessions (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                mode TEXT NOT NULL,
-                pdf_id TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create index on session_id for faster queries
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_session_id 
-            ON chat_history(session_id)
-        """)
-        
-        conn.commit()
-        conn.close()
-    
+        with self._pool.acquire() as conn:
+            cursor = conn.cursor()
+
+            # Chat history table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chat_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    message_type TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    metadata TEXT,
+                    FOREIGN KEY (session_id) REFERENCES sessions(id)
+                        ON DELETE CASCADE
+                )
+            """)
+
+            # Sessions table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    pdf_id TEXT,
+                    created_at DATETIME DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+                    updated_at DATETIME DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+                )
+            """)
+
+            # Composite index: serves the session filter and the
+            # timestamp ordering with a single index range scan, no sort
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_session_ts
+                ON chat_history(session_id, timestamp)
+            """)
+            cursor.execute("DROP INDEX IF EXISTS idx_session_id")
+
+            conn.commit()
+
     def save_message(
-        self, 
-        session_id: str, 
-        message_type: str, 
-        content: str, 
-        metadata: Optional[Dict[str, Any]] = None
+        self,
+        session_id: str,
+        message_type: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        touch_session: bool = False
     ) -> int:
-        """Save a chat message to the database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        metadata_json = json.dumps(metadata) if metadata else None
-        
-        cursor.execute("""
-            INSERT INTO chat_history (session_id, message_type, content, metadata)
-            VALUES (?, ?, ?, ?)
-        """, (session_id, message_type, content, metadata_json))
-        
-        message_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
+        """Save a chat message to the database.
+
+        With touch_session=True the session's updated_at is bumped inside
+        the same transaction, saving a second commit.
+        """
+        # Stored as a BLOB: orjson emits bytes, so skip the decode/encode
+        # round trip on both write and read
+        metadata_json = orjson.dumps(metadata) if metadata else None
+
+        with self._pool.acquire() as conn:
+            with conn:
+                cursor = conn.execute(
+                    _SQL_INSERT_MESSAGE_RETURNING,
+                    (session_id, message_type, content, metadata_json))
+                message_id = cursor.fetchone()['id']
+                if touch_session:
+                    conn.execute(_SQL_UPDATE_SESSION_TIMESTAMP, (session_id,))
+
+        if touch_session:
+            with self._cache_lock:
+                self._session_cache.pop(session_id, None)
+                self._sessions_listing = None
+
         return message_id
-    
-    def get_chat_history(
-        self, 
+
+    def save_messages(
+        self,
+        messages: List[tuple],
+        touch_session_id: Optional[str] = None
+    ) -> int:
+        """Save multiple chat messages in a single transaction.
+
+        Each entry is a (session_id, message_type, content, metadata) tuple
+        where metadata is an optional dict. All rows share one BEGIN/COMMIT,
+        so a batch costs a single fsync instead of one per message. Passing
+        touch_session_id folds the session's updated_at bump into the same
+        transaction as well.
+        """
+        rows = [
+            (session_id, message_type, content,
+             orjson.dumps(metadata) if metadata else None)
+            for session_id, message_type, content, metadata in messages
+        ]
+
+        with self._pool.acquire() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(_SQL_INSERT_MESSAGE, rows)
+                if touch_session_id:
+                    conn.execute(_SQL_UPDATE_SESSION_TIMESTAMP, (touch_session_id,))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            # Refresh planner statistics after a large batch so the
+            # composite index keeps being chosen as the table grows
+            if len(rows) > 1000:
+                conn.execute("ANALYZE chat_history")
+
+        if touch_session_id:
+            with self._cache_lock:
+                self._session_cache.pop(touch_session_id, None)
+                self._sessions_listing = None
+
+        return len(rows)
+
+    def iter_chat_history(
+        self,
         session_id: Optional[str] = None,
-        limit: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
-        """Retrieve chat history, optionally filtered by session_id."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
+        limit: Optional[int] = None,
+        include_metadata: bool = False,
+        newest_first: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream chat history rows, optionally filtered by session_id.
+
+        Yields row dicts straight off the cursor instead of materializing
+        the full result set, keeping memory constant for large histories.
+        LIMIT is bound as a parameter rather than interpolated. Metadata
+        (the retrieved-chunks payload) is neither selected nor parsed
+        unless include_metadata is set. newest_first walks the session
+        backwards, so with limit it yields the recent end of the history
+        (the all-sessions listing is newest-first already).
+        """
         if session_id:
-            query = """
-                SELECT * FROM chat_history 
-                WHERE session_id = ? 
-                ORDER BY timestamp ASC
-            """
+            if newest_first:
+                query = (_SQL_SELECT_HISTORY_BY_SESSION_DESC_WITH_META
+                         if include_metadata
+                         else _SQL_SELECT_HISTORY_BY_SESSION_DESC)
+            else:
+                query = (_SQL_SELECT_HISTORY_BY_SESSION_WITH_META
+                         if include_metadata else _SQL_SELECT_HISTORY_BY_SESSION)
             params = (session_id,)
         else:
-            query = """
-                SELECT * FROM chat_history 
-                ORDER BY timestamp DESC
-            """
+            query = (_SQL_SELECT_HISTORY_ALL_WITH_META
+                     if include_metadata else _SQL_SELECT_HISTORY_ALL)
             params = ()
-        
+
         if limit:
-            query += f" LIMIT {limit}"
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        messages = []
-        for row in rows:
-            metadata = json.loads(row['metadata']) if row['metadata'] else None
-            messages.append({
-                'id': row['id'],
-                'session_id': row['session_id'],
-                'message_type': row['message_type'],
-                'content': row['content'],
-                'timestamp': row['timestamp'],
-                'metadata': metadata
-            })
-        
-        return messages
-    
+            query += " LIMIT ?"
+            params += (limit,)
+
+        with self._pool.acquire(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            for row in cursor:
+                message = {
+                    'id': row['id'],
+                    'session_id': row['session_id'],
+                    'message_type': row['message_type'],
+                    'content': row['content'],
+                    'timestamp': row['timestamp']
+                }
+                if include_metadata:
+                    message['metadata'] = (
+                        orjson.loads(row['metadata']) if row['metadata'] else None
+                    )
+                yield message
+
+    def get_chat_history(
+        self,
+        session_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        include_metadata: bool = False,
+        recent: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Retrieve chat history, optionally filtered by session_id.
+
+        With recent=True the limit applies to the newest messages and the
+        result is still returned in chronological order -- what chat
+        context wants, where plain ORDER BY ASC LIMIT would return the
+        oldest end of the session.
+        """
+        if recent:
+            messages = list(self.iter_chat_history(
+                session_id, limit, include_metadata, newest_first=True
+            ))
+            messages.reverse()
+            return messages
+        return list(self.iter_chat_history(session_id, limit, include_metadata))
+
     def delete_session(self, session_id: str) -> int:
         """Delete all messages for a given session."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            DELETE FROM chat_history WHERE session_id = ?
-        """, (session_id,))
-        
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
-        
+        with self._pool.acquire() as conn:
+            with conn:
+                cursor = conn.execute(_SQL_DELETE_MESSAGES, (session_id,))
+                deleted_count = cursor.rowcount
+
         return deleted_count
-    
+
     # Session Management
-    
+
     def create_session(
         self,
         session_id: str,
@@ -148,43 +399,39 @@ class ChatDatabase:
         pdf_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Create a new chat session."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        from datetime import datetime
-        now = datetime.now().isoformat()
-        
-        cursor.execute("""
-            INSERT INTO sessions (id, name, mode, pdf_id, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (session_id, name, mode, pdf_id, now, now))
-        
-        conn.commit()
-        conn.close()
-        
-        return {
+        with self._pool.acquire() as conn:
+            with conn:
+                cursor = conn.execute(_SQL_INSERT_SESSION,
+                                      (session_id, name, mode, pdf_id))
+                row = cursor.fetchone()
+
+        session = {
             'id': session_id,
             'name': name,
             'mode': mode,
             'pdf_id': pdf_id,
-            'created_at': now,
-            'updated_at': now
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
         }
-    
+
+        with self._cache_lock:
+            self._session_cache[session_id] = session
+            self._sessions_listing = None
+
+        return session
+
     def get_all_sessions(self) -> List[Dict[str, Any]]:
         """Get all chat sessions."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM sessions 
-            ORDER BY updated_at DESC
-        """)
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
+        with self._cache_lock:
+            if self._sessions_listing is not None:
+                return self._sessions_listing
+
+        with self._pool.acquire(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_SELECT_ALL_SESSIONS)
+
+            rows = cursor.fetchall()
+
         sessions = []
         for row in rows:
             sessions.append({
@@ -195,24 +442,27 @@ class ChatDatabase:
                 'created_at': row['created_at'],
                 'updated_at': row['updated_at']
             })
-        
+
+        with self._cache_lock:
+            self._sessions_listing = sessions
+
         return sessions
-    
+
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific session by ID."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM sessions WHERE id = ?
-        """, (session_id,))
-        
-        row = cursor.fetchone()
-        conn.close()
-        
+        with self._cache_lock:
+            cached = self._session_cache.get(session_id)
+            if cached is not None:
+                return cached
+
+        with self._pool.acquire(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_SELECT_SESSION, (session_id,))
+
+            row = cursor.fetchone()
+
         if row:
-            return {
+            session = {
                 'id': row['id'],
                 'name': row['name'],
                 'mode': row['mode'],
@@ -220,66 +470,73 @@ class ChatDatabase:
                 'created_at': row['created_at'],
                 'updated_at': row['updated_at']
             }
+            with self._cache_lock:
+                self._session_cache[session_id] = session
+            return session
         return None
-    
+
     def delete_session_and_messages(self, session_id: str) -> bool:
-        """Delete a session and all its messages."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Delete messages first
-        cursor.execute("""
-            DELETE FROM chat_history WHERE session_id = ?
-        """, (session_id,))
-        
-        # Delete session
-        cursor.execute("""
-            DELETE FROM sessions WHERE id = ?
-        """, (session_id,))
-        
-        conn.commit()
-        conn.close()
-        
+        """Delete a session and all its messages.
+
+        Both DELETEs run in one transaction (one fsync). The explicit
+        chat_history DELETE is kept even though the schema declares
+        ON DELETE CASCADE: legacy database files predate the FK and
+        CREATE TABLE IF NOT EXISTS cannot retrofit it, so relying on the
+        cascade alone would silently orphan their messages.
+        """
+        with self._pool.acquire() as conn:
+            with conn:
+                conn.execute(_SQL_DELETE_MESSAGES, (session_id,))
+                conn.execute(_SQL_DELETE_SESSION, (session_id,))
+
+        with self._cache_lock:
+            self._session_cache.pop(session_id, None)
+            self._sessions_listing = None
+
         return True
-    
+
+    def optimize(self):
+        """Run PRAGMA optimize; cheap, intended for lifespan shutdown."""
+        with self._pool.acquire() as conn:
+            conn.execute("PRAGMA optimize")
+
+    def close(self):
+        """Release all pooled connections."""
+        self._pool.close()
+
     def update_session_timestamp(self, session_id: str):
         """Update the updated_at timestamp for a session."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        from datetime import datetime
-        now = datetime.now().isoformat()
-        
-        cursor.execute("""
-            UPDATE sessions SET updated_at = ? WHERE id = ?
-        """, (now, session_id))
-        
-        conn.commit()
-        conn.close()
-
+        with self._pool.acquire() as conn:
+            with conn:
+                conn.execute(_SQL_UPDATE_SESSION_TIMESTAMP, (session_id,))
 
-# Singleton instance
-_db_instance = None
+        with self._cache_lock:
+            self._session_cache.pop(session_id, None)
+            self._sessions_listing = None
 
 
+@lru_cache(maxsize=1)
 def get_database():
-    """Get or create the database singleton instance."""
-    global _db_instance
-    if _db_instance is None:
-        # Check if Appwrite is configured
-        if config.APPWRITE_PROJECT_ID and config.APPWRITE_API_KEY:
-            try:
-                print("Attempting to initialize Appwrite Database...")
-                from database.db_appwrite import AppwriteChatDatabase
-                _db_instance = AppwriteChatDatabase()
-                print("✅ Using Appwrite Database")
-            except Exception as e:
-                import traceback
-                traceback.print_exc()
-                print(f"❌ Failed to initialize Appwrite Database: {e}. Falling back to SQLite.")
-                _db_instance = ChatDatabase()
-        else:
-            _db_instance = ChatDatabase()
-            print("Using SQLite Database")
-            
-    return _db_instance
+    """Get or create the database singleton instance.
+
+    Cached with lru_cache so it doubles as a FastAPI dependency: routes
+    inject it via Depends(get_database) and tests can swap the backend
+    through app.dependency_overrides.
+    """
+    # Check if Appwrite is configured
+    if config.APPWRITE_PROJECT_ID and config.APPWRITE_API_KEY:
+        try:
+            print("Attempting to initialize Appwrite Database...")
+            from database.db_appwrite import AppwriteChatDatabase
+            db = AppwriteChatDatabase()
+            print("✅ Using Appwrite Database")
+            return db
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            print(f"❌ Failed to initialize Appwrite Database: {e}. Falling back to SQLite.")
+            return ChatDatabase()
+
+    db = ChatDatabase()
+    print("Using SQLite Database")
+    return db
@@ -2,14 +2,17 @@
 Appwrite database implementation for chat history.
 """
 from typing import List, Optional, Dict, Any
-from datetime import datetime
-import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import orjson
 from appwrite.query import Query
 from services.appwrite_service import get_appwrite_service
 import config
 
 class AppwriteChatDatabase:
     """Manages Appwrite database for chat history."""
+
+    _PAGE_SIZE = 100
     
     def __init__(self):
         self.appwrite = get_appwrite_service()
@@ -19,6 +22,9 @@ class AppwriteChatDatabase:
         self.db_id = config.APPWRITE_DATABASE_ID
         self.collection_id = config.APPWRITE_COLLECTION_ID
         self.sessions_collection_id = "sessions" # We need a separate collection for sessions
+        # Shared pool for firing Appwrite HTTP calls off the request path;
+        # the SDK client is blocking, so concurrency comes from threads
+        self._executor = ThreadPoolExecutor(max_workers=10)
     
     def init_database(self):
         """Appwrite resources are assumed to exist or created via console."""
@@ -29,13 +35,23 @@ class AppwriteChatDatabase:
         session_id: str, 
         message_type: str, 
         content: str, 
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        touch_session: bool = False,
+        timestamp: Optional[str] = None
     ) -> str:
-        """Save a chat message to Appwrite."""
+        """Save a chat message to Appwrite.
+
+        timestamp lets batch callers pre-assign ordered timestamps; by
+        default the message is stamped with the current time.
+        """
+        if touch_session:
+            # Appwrite has no transactions; the timestamp update is a
+            # separate fire-and-forget call alongside the save
+            self.update_session_timestamp(session_id)
         from appwrite.id import ID
         
         # Appwrite might prefer empty string over None for optional string attributes
-        metadata_json = json.dumps(metadata) if metadata else "{}"
+        metadata_json = orjson.dumps(metadata).decode() if metadata else "{}"
         
         try:
             result = self.appwrite.databases.create_document(
@@ -47,7 +63,7 @@ class AppwriteChatDatabase:
                     "message_type": message_type,
                     "content": content,
                     # "metadata": metadata_json, # Temporarily disabled due to schema mismatch
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": timestamp or datetime.now().isoformat()
                 }
             )
             return result['$id']
@@ -55,38 +71,117 @@ class AppwriteChatDatabase:
             print(f"❌ Error saving message to Appwrite: {e}")
             raise e
     
+    def save_messages(
+        self,
+        messages: List[tuple],
+        touch_session_id: Optional[str] = None
+    ) -> List[str]:
+        """Save multiple chat messages, firing the HTTP calls concurrently.
+
+        Mirrors ChatDatabase.save_messages: each entry is a
+        (session_id, message_type, content, metadata) tuple, and
+        touch_session_id bumps the session timestamp alongside the saves.
+
+        Timestamps are assigned in list order *before* the concurrent
+        submits: stamping inside the workers let an answer land with an
+        earlier timestamp than its question, which inverted the
+        conversation in timestamp-ordered history reads.
+        """
+        base = datetime.now()
+        futures = [
+            self._executor.submit(
+                self.save_message, session_id, message_type, content, metadata,
+                timestamp=(base + timedelta(microseconds=i)).isoformat()
+            )
+            for i, (session_id, message_type, content, metadata)
+            in enumerate(messages)
+        ]
+        if touch_session_id:
+            self.update_session_timestamp(touch_session_id)
+        return [future.result() for future in futures]
+
+    def _list_all_documents(
+        self,
+        collection_id: str,
+        queries: List[Any]
+    ) -> List[Dict[str, Any]]:
+        """List every document matching the queries, 100 per page.
+
+        Appwrite caps list_documents at 25 documents by default, silently
+        truncating long histories. Fetch the first page to learn the total,
+        then pull the remaining pages concurrently by offset.
+        """
+        first = self.appwrite.databases.list_documents(
+            database_id=self.db_id,
+            collection_id=collection_id,
+            queries=queries + [Query.limit(self._PAGE_SIZE)]
+        )
+        documents = list(first['documents'])
+        total = first['total']
+
+        if total > self._PAGE_SIZE:
+            pages = [
+                self._executor.submit(
+                    self.appwrite.databases.list_documents,
+                    database_id=self.db_id,
+                    collection_id=collection_id,
+                    queries=queries + [Query.limit(self._PAGE_SIZE),
+                                       Query.offset(offset)]
+                )
+                for offset in range(self._PAGE_SIZE, total, self._PAGE_SIZE)
+            ]
+            for future in pages:
+                documents.extend(future.result()['documents'])
+
+        return documents
+
     def get_chat_history(
-        self, 
+        self,
         session_id: Optional[str] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        include_metadata: bool = False,
+        recent: bool = False
     ) -> List[Dict[str, Any]]:
-        """Retrieve chat history from Appwrite."""
-        queries = [Query.order_asc("timestamp")]
-        
+        """Retrieve chat history from Appwrite.
+
+        With recent=True the limit applies to the newest messages and the
+        result is returned in chronological order, matching
+        ChatDatabase.get_chat_history.
+        """
+        queries = [Query.order_desc("timestamp") if recent
+                   else Query.order_asc("timestamp")]
+
         if session_id:
             queries.append(Query.equal("session_id", session_id))
-            
+
         if limit:
-            queries.append(Query.limit(limit))
-            
-        result = self.appwrite.databases.list_documents(
-            database_id=self.db_id,
-            collection_id=self.collection_id,
-            queries=queries
-        )
-        
+            result = self.appwrite.databases.list_documents(
+                database_id=self.db_id,
+                collection_id=self.collection_id,
+                queries=queries + [Query.limit(limit)]
+            )
+            documents = result['documents']
+        else:
+            documents = self._list_all_documents(self.collection_id, queries)
+
+        if recent:
+            documents = list(reversed(documents))
+
         messages = []
-        for doc in result['documents']:
-            metadata = json.loads(doc['metadata']) if doc.get('metadata') else None
-            messages.append({
+        for doc in documents:
+            message = {
                 'id': doc['$id'],
                 'session_id': doc['session_id'],
                 'message_type': doc['message_type'],
                 'content': doc['content'],
-                'timestamp': doc['timestamp'],
-                'metadata': metadata
-            })
-            
+                'timestamp': doc['timestamp']
+            }
+            if include_metadata:
+                message['metadata'] = (
+                    orjson.loads(doc['metadata']) if doc.get('metadata') else None
+                )
+            messages.append(message)
+
         return messages
 
     def create_session(
@@ -123,14 +218,13 @@ class AppwriteChatDatabase:
 
     def get_all_sessions(self) -> List[Dict[str, Any]]:
         """Get all chat sessions."""
-        result = self.appwrite.databases.list_documents(
-            database_id=self.db_id,
-            collection_id=self.sessions_collection_id,
-            queries=[Query.order_desc("updated_at")]
+        documents = self._list_all_documents(
+            self.sessions_collection_id,
+            [Query.order_desc("updated_at")]
         )
-        
+
         sessions = []
-        for doc in result['documents']:
+        for doc in documents:
             sessions.append({
                 'id': doc['$id'],
                 'name': doc['name'],
@@ -169,28 +263,36 @@ class AppwriteChatDatabase:
                 collection_id=self.sessions_collection_id,
                 document_id=session_id
             )
-            
-            # Delete messages (this might be slow if many messages, ideally use backend function)
-            # For now, we'll list and delete
+
+            # Delete messages concurrently instead of one blocking
+            # round-trip per document
             messages = self.get_chat_history(session_id)
-            for msg in messages:
-                self.appwrite.databases.delete_document(
+            deletes = [
+                self._executor.submit(
+                    self.appwrite.databases.delete_document,
                     database_id=self.db_id,
                     collection_id=self.collection_id,
                     document_id=msg['id']
                 )
+                for msg in messages
+            ]
+            for future in deletes:
+                future.result()
             return True
         except:
             return False
 
     def update_session_timestamp(self, session_id: str):
-        """Update session timestamp."""
-        try:
-            self.appwrite.databases.update_document(
-                database_id=self.db_id,
-                collection_id=self.sessions_collection_id,
-                document_id=session_id,
-                data={"updated_at": datetime.now().isoformat()}
-            )
-        except:
-            pass
+        """Update session timestamp (fire-and-forget off the request path)."""
+        def _update():
+            try:
+                self.appwrite.databases.update_document(
+                    database_id=self.db_id,
+                    collection_id=self.sessions_collection_id,
+                    document_id=session_id,
+                    data={"updated_at": datetime.now().isoformat()}
+                )
+            except:
+                pass
+
+        self._executor.submit(_update)
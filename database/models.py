@@ -1,13 +1,15 @@
 """
 Pydantic models for request/response validation and data structures.
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 
 class ChatMessage(BaseModel):
     """Model for a single chat message."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     id: Optional[str] = None
     session_id: str
     message_type: str  # "user" or "assistant"
@@ -28,13 +30,37 @@ class PDFUploadResponse(BaseModel):
 
 class QueryRequest(BaseModel):
     """Request model for querying the knowledge base."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     query: str = Field(..., min_length=1, description="The user's question")
     top_k: int = Field(default=5, ge=1, le=20, description="Number of chunks to retrieve")
     session_id: Optional[str] = Field(default=None, description="Optional session ID for context")
 
 
+class RetrieveRequest(BaseModel):
+    """Request model for the frontend-compatible /retrieve endpoint."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+    query: str
+    pdf_id: Optional[str] = None
+    top_k: int = 5
+
+
+class QueryWithContextRequest(BaseModel):
+    """Request model for the combined /query-with-context endpoint."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+    query: str
+    session_id: str
+    pdf_id: Optional[str] = None
+    top_k: int = 5
+    history_limit: int = 5
+
+
 class RetrievedChunk(BaseModel):
     """Model for a retrieved chunk with metadata."""
+    model_config = ConfigDict(extra='ignore')
+
     text: str
     score: float
     metadata: Dict[str, Any]
@@ -64,6 +90,8 @@ class SaveMessageResponse(BaseModel):
 
 class ChatHistoryResponse(BaseModel):
     """Response with chat history."""
+    model_config = ConfigDict(extra='ignore')
+
     success: bool
     messages: List[ChatMessage]
     session_id: Optional[str] = None
@@ -71,6 +99,8 @@ class ChatHistoryResponse(BaseModel):
 
 class Session(BaseModel):
     """Model for a chat session."""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     id: str
     name: str
     mode: str  # "chat" or "pdf"
@@ -1,10 +1,14 @@
 """
 FastAPI main application entry point.
 """
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import Depends, FastAPI, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import asyncio
+import orjson
 import config
+from middleware import PureCORSMiddleware
 
 # Import routers
 from routes.upload import router as upload_router
@@ -13,6 +17,32 @@ from routes.chat import router as chat_router
 from routes.sessions import router as sessions_router
 
 
+async def _warm_services():
+    """Initialize the heavy services off the startup path.
+
+    The get_* singletons are idempotent, so endpoints that win the race
+    simply pay the initialization cost themselves on first use.
+    """
+    from services.embedding_service import get_embedding_service
+    from services.pinecone_service import get_pinecone_service
+    from services.semantic_cache import get_semantic_cache
+
+    await asyncio.to_thread(get_embedding_service)
+    # One tiny embed primes the TLS connection so the first user query
+    # doesn't pay the handshake
+    await get_embedding_service().warm()
+    print("✓ Embedding service loaded")
+
+    await asyncio.to_thread(get_pinecone_service)
+    print("✓ Pinecone service connected")
+
+    loaded = await asyncio.to_thread(lambda: get_semantic_cache().load_persisted())
+    if loaded:
+        print(f"✓ Semantic cache warmed with {loaded} entries")
+
+    print("✅ All services warmed up")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -22,30 +52,34 @@ async def lifespan(app: FastAPI):
     print("=" * 50)
     print("🚀 Starting RAG Chatbot Backend")
     print("=" * 50)
-    
-    # Import services to trigger initialization
-    from services.embedding_service import get_embedding_service
-    from services.pinecone_service import get_pinecone_service
+
     from database.db import get_database
-    
-    # Initialize services
+
     print("\n📚 Initializing services...")
     get_database()
     print("✓ Database initialized")
-    
-    get_embedding_service()
-    print("✓ Embedding service loaded")
-    
-    get_pinecone_service()
-    print("✓ Pinecone service connected")
-    
-    print("\n✅ All services initialized successfully")
+
+    # Warm the embedding/Pinecone clients in the background so the server
+    # (and /health) starts accepting traffic immediately
+    warm_task = asyncio.create_task(_warm_services())
+
+    # Keep a pool of pre-generated session IDs topped up
+    from routes.sessions import refill_uuid_pool
+    uuid_task = asyncio.create_task(refill_uuid_pool())
+
     print(f"📡 Server running on http://{config.API_HOST}:{config.API_PORT}")
     print("=" * 50)
-    
+
     yield
-    
+
     # Shutdown
+    warm_task.cancel()
+    uuid_task.cancel()
+    db = get_database()
+    if hasattr(db, 'optimize'):
+        db.optimize()
+    if hasattr(db, 'close'):
+        db.close()
     print("\n👋 Shutting down RAG Chatbot Backend")
 
 
@@ -54,17 +88,14 @@ app = FastAPI(
     title="RAG Chatbot Backend",
     description="Backend API for a personal RAG chatbot with PDF processing and vector search",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=config.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Configure CORS (pure-ASGI) and response compression; GZip is added last
+# so it wraps the whole chain
+app.add_middleware(PureCORSMiddleware, origins=config.CORS_ORIGINS)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Include routers
 app.include_router(upload_router, tags=["PDF Upload"])
@@ -75,75 +106,35 @@ app.include_router(sessions_router, tags=["Sessions"])
 
 # Wrapper endpoints for frontend compatibility
 
-from fastapi import UploadFile, File
-from database.models import QueryRequest, RetrievedChunk, ChatMessage
-from services.embedding_service import get_embedding_service
-from services.pinecone_service import get_pinecone_service
+from database.models import ChatMessage
 from database.db import get_database
-
-
-from pydantic import BaseModel
-
-class RetrieveRequest(BaseModel):
-    query: str
-    pdf_id: str = None
-    top_k: int = 5
-
-@app.post("/retrieve", tags=["Query"])
-async def retrieve_chunks(request: RetrieveRequest):
-    """
-    Retrieve chunks for a query (wrapper for /query endpoint).
-    Frontend compatibility endpoint.
-    """
-    try:
-        embedding_service = get_embedding_service()
-        pinecone_service = get_pinecone_service()
-        
-        # Generate query embedding
-        query_embedding = embedding_service.generate_embedding(request.query)
-        
-        # Query Pinecone (optionally filter by pdf_id if provided)
-        filter_dict = {"filename": request.pdf_id} if request.pdf_id else None
-        results = pinecone_service.query(
-            query_embedding=query_embedding,
-            top_k=request.top_k,
-            filter_dict=filter_dict
-        )
-        
-        # Return just the text chunks
-        chunks = [result['text'] for result in results]
-        
-        return {"chunks": chunks}
-        
-    except Exception as e:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=500, detail=f"Error retrieving chunks: {str(e)}")
+from pydantic import BaseModel, ConfigDict
 
 
 class SaveMessageWrapperRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     session_id: str
     role: str
     content: str
 
 @app.post("/messages", response_model=ChatMessage, tags=["Chat History"])
-async def save_message_endpoint(request: SaveMessageWrapperRequest):
+async def save_message_endpoint(request: SaveMessageWrapperRequest, db=Depends(get_database)):
     """
     Save a message (wrapper for chat service).
     Frontend compatibility endpoint.
     """
     try:
-        db = get_database()
-        
-        # Save message
-        message_id = db.save_message(
+        # Save message and bump the session timestamp in one transaction
+        # (SQLite call runs in a worker thread)
+        message_id = await asyncio.to_thread(
+            db.save_message,
             session_id=request.session_id,
             message_type=request.role,
-            content=request.content
+            content=request.content,
+            touch_session=True
         )
         
-        # Update session timestamp
-        db.update_session_timestamp(request.session_id)
-        
         from datetime import datetime
         return ChatMessage(
             id=str(message_id),
@@ -161,27 +152,49 @@ async def save_message_endpoint(request: SaveMessageWrapperRequest):
         raise HTTPException(status_code=500, detail=f"Error saving message: {str(e)}")
 
 
+# Static payloads serialized once at import time; the handlers return the
+# bytes directly, skipping dict building and JSON encoding per hit (the
+# health endpoint takes liveness-probe traffic every few seconds)
+_ROOT_BODY = orjson.dumps({
+    "message": "RAG Chatbot Backend API",
+    "version": "1.0.0",
+    "status": "running"
+})
+
+_HEALTH_BODY = orjson.dumps({"status": "healthy"})
+
+
 @app.get("/", tags=["Health"])
 async def root():
     """Root endpoint."""
-    return {
-        "message": "RAG Chatbot Backend API",
-        "version": "1.0.0",
-        "status": "running"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(
-        "main:app",
-        host=config.API_HOST,
-        port=config.API_PORT,
-        reload=True
-    )
+
+    # Dev-only autoreload; uvloop/httptools come with uvicorn[standard]
+    if os.getenv("RELOAD", "").lower() in ("1", "true", "yes"):
+        uvicorn.run(
+            "main:app",
+            host=config.API_HOST,
+            port=config.API_PORT,
+            reload=True
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host=config.API_HOST,
+            port=config.API_PORT,
+            loop="uvloop",
+            http="httptools",
+            workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+            access_log=False
+        )
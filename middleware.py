@@ -0,0 +1,92 @@
+"""
+Pure-ASGI middleware for the FastAPI app.
+"""
+from typing import Iterable
+
+
+class PureCORSMiddleware:
+    """CORS handling implemented directly against the ASGI protocol.
+
+    Avoids the per-request Request/Response object creation and extra
+    coroutine task of the BaseHTTPMiddleware code path: preflights are
+    short-circuited at the protocol level and responses get their
+    access-control headers appended while the http.response.start message
+    passes through.
+    """
+
+    _MAX_AGE = b"600"
+
+    def __init__(self, app, origins: Iterable[str], allow_credentials: bool = True):
+        self.app = app
+        self.origins = {origin.encode() for origin in origins}
+        self.allow_all = b"*" in self.origins
+        self.allow_credentials = allow_credentials
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_method = None
+        request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed = self.allow_all or origin in self.origins
+
+        # Preflight: answer directly without entering the router
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            if not allowed:
+                await send({
+                    "type": "http.response.start",
+                    "status": 400,
+                    "headers": [(b"content-length", b"0")],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            headers = [
+                (b"access-control-allow-origin", origin),
+                (b"access-control-allow-methods", request_method),
+                (b"access-control-max-age", self._MAX_AGE),
+                (b"vary", b"Origin"),
+                (b"content-length", b"0"),
+            ]
+            if request_headers is not None:
+                headers.append((b"access-control-allow-headers", request_headers))
+            if self.allow_credentials:
+                headers.append((b"access-control-allow-credentials", b"true"))
+
+            await send({
+                "type": "http.response.start",
+                "status": 204,
+                "headers": headers,
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if not allowed:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((b"access-control-allow-origin", origin))
+                headers.append((b"vary", b"Origin"))
+                if self.allow_credentials:
+                    headers.append((b"access-control-allow-credentials", b"true"))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
@@ -1,7 +1,9 @@
 """
 Chat routes for managing chat history.
 """
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
 from database.models import (
     SaveMessageRequest, 
@@ -14,14 +16,14 @@ router = APIRouter()
 
 
 @router.post("/save-message", response_model=SaveMessageResponse)
-async def save_message(request: SaveMessageRequest):
+async def save_message(request: SaveMessageRequest,
+                       chat_service=Depends(get_chat_service)):
     """
     Save a chat message (question + answer) to the database.
     """
     try:
-        chat_service = get_chat_service()
-        
-        success = chat_service.save_conversation(
+        success = await asyncio.to_thread(
+            chat_service.save_conversation,
             session_id=request.session_id,
             question=request.question,
             answer=request.answer,
@@ -43,15 +45,16 @@ async def save_message(request: SaveMessageRequest):
 @router.get("/chat-history", response_model=ChatHistoryResponse)
 async def get_chat_history(
     session_id: Optional[str] = Query(None, description="Session ID to filter by"),
-    limit: Optional[int] = Query(None, description="Maximum number of messages to return")
+    limit: Optional[int] = Query(None, description="Maximum number of messages to return"),
+    chat_service=Depends(get_chat_service)
 ):
     """
     Retrieve chat history, optionally filtered by session.
     """
     try:
-        chat_service = get_chat_service()
-        
-        messages = chat_service.get_history(session_id=session_id, limit=limit)
+        messages = await asyncio.to_thread(
+            chat_service.get_history, session_id=session_id, limit=limit
+        )
         
         return ChatHistoryResponse(
             success=True,
@@ -63,15 +66,42 @@ async def get_chat_history(
         raise HTTPException(status_code=500, detail=f"Error retrieving chat history: {str(e)}")
 
 
+@router.get("/chat-history/{session_id}/with-context", response_model=ChatHistoryResponse)
+async def get_chat_history_with_context(
+    session_id: str,
+    limit: Optional[int] = Query(None, description="Maximum number of messages to return"),
+    chat_service=Depends(get_chat_service)
+):
+    """
+    Retrieve chat history for a session including the retrieved-chunks
+    metadata. The plain /chat-history endpoint skips that payload.
+    """
+    try:
+        messages = await asyncio.to_thread(
+            chat_service.get_history, session_id=session_id, limit=limit,
+            include_metadata=True
+        )
+
+        return ChatHistoryResponse(
+            success=True,
+            messages=messages,
+            session_id=session_id
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving chat history: {str(e)}")
+
+
 @router.delete("/chat-history/{session_id}")
-async def delete_chat_history(session_id: str):
+async def delete_chat_history(session_id: str,
+                              chat_service=Depends(get_chat_service)):
     """
     Delete all messages for a specific session.
     """
     try:
-        chat_service = get_chat_service()
-        
-        deleted_count = chat_service.delete_session_history(session_id)
+        deleted_count = await asyncio.to_thread(
+            chat_service.delete_session_history, session_id
+        )
         
         return {
             "success": True,
@@ -1,53 +1,160 @@
 """
 Query route for retrieving relevant chunks from Pinecone.
 """
+import asyncio
+
 from fastapi import APIRouter, HTTPException
-from database.models import QueryRequest, QueryResponse, RetrievedChunk
-from services.embedding_service import get_embedding_service
-from services.pinecone_service import get_pinecone_service
+from fastapi.responses import ORJSONResponse
+from database.models import (
+    QueryRequest,
+    QueryResponse,
+    QueryWithContextRequest,
+    RetrieveRequest
+)
 
 router = APIRouter()
 
 
+async def _do_query(query: str, top_k: int, pdf_id=None):
+    """Shared embed-and-retrieve pipeline for /query and /retrieve.
+
+    Checks the semantic cache (exact string, then near-duplicate
+    embedding) before paying the Cohere and Pinecone round trips.
+    """
+    # Lazy imports keep the Cohere/Pinecone SDKs out of the cold-start
+    # import chain; the singletons exist after first use
+    from services.embedding_service import get_embedding_service
+    from services.pinecone_service import get_pinecone_service
+    from services.semantic_cache import get_semantic_cache
+
+    cache = get_semantic_cache()
+
+    # Repeated queries skip both the Cohere and Pinecone round-trips
+    cached = cache.lookup(query, top_k, pdf_id=pdf_id)
+    if cached is not None:
+        _, results = cached
+        return results
+
+    embedding_service = get_embedding_service()
+    pinecone_service = get_pinecone_service()
+
+    # Generate query embedding
+    query_embedding = await embedding_service.generate_embedding(query)
+
+    # Near-duplicate (paraphrased) queries reuse cached results
+    results = cache.lookup_by_embedding(query_embedding, top_k, pdf_id=pdf_id)
+    if results is None:
+        # Query Pinecone off the event loop (sync SDK); filter by pdf_id
+        # when provided
+        filter_dict = {"filename": pdf_id} if pdf_id else None
+        results = await asyncio.to_thread(
+            pinecone_service.query,
+            query_embedding=query_embedding,
+            top_k=top_k,
+            filter_dict=filter_dict
+        )
+        cache.put(query, query_embedding, results, pdf_id=pdf_id)
+
+    return results
+
+
 @router.post("/query", response_model=QueryResponse)
 async def query_knowledge_base(request: QueryRequest):
     """
     Query the knowledge base for relevant chunks.
-    
+
     Steps:
     1. Generate embedding for the query
     2. Search Pinecone for similar vectors
     3. Return top-k chunks with metadata
     """
     try:
-        # Get services
+        results = await _do_query(request.query, request.top_k)
+
+        # Results are plain dicts in the response shape already; returning
+        # an ORJSONResponse skips per-hit model construction and the
+        # response_model serialization pass (the decorator keeps the docs)
+        chunks = [
+            {
+                'text': result['text'],
+                'score': result['score'],
+                'metadata': result['metadata']
+            }
+            for result in results
+        ]
+
+        return ORJSONResponse({
+            'success': True,
+            'query': request.query,
+            'chunks': chunks,
+            'message': f"Retrieved {len(chunks)} relevant chunks"
+        })
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying knowledge base: {str(e)}")
+
+
+@router.post("/retrieve")
+async def retrieve_chunks(request: RetrieveRequest):
+    """
+    Retrieve chunks for a query (wrapper for /query endpoint).
+    Frontend compatibility endpoint.
+    """
+    try:
+        results = await _do_query(request.query, request.top_k,
+                                  pdf_id=request.pdf_id)
+
+        # Return just the text chunks
+        chunks = [result['text'] for result in results]
+
+        return ORJSONResponse({"chunks": chunks})
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving chunks: {str(e)}")
+
+
+@router.post("/query-with-context")
+async def query_with_context(request: QueryWithContextRequest):
+    """
+    Retrieve chunks and recent session history in one request.
+
+    The query embedding and the history fetch are independent I/Os, so
+    they run concurrently; only the Pinecone search has to wait for the
+    embedding. Saves the frontend a second round trip per turn.
+    """
+    try:
+        from database.db import get_database
+        from services.embedding_service import get_embedding_service
+        from services.pinecone_service import get_pinecone_service
+
+        db = get_database()
         embedding_service = get_embedding_service()
         pinecone_service = get_pinecone_service()
-        
-        # Generate query embedding
-        query_embedding = embedding_service.generate_embedding(request.query)
-        
-        # Query Pinecone
-        results = pinecone_service.query(
-            query_embedding=query_embedding,
-            top_k=request.top_k
+
+        query_embedding, history = await asyncio.gather(
+            embedding_service.generate_embedding(request.query),
+            asyncio.to_thread(
+                db.get_chat_history, request.session_id,
+                request.history_limit, recent=True
+            )
         )
-        
-        # Format results
-        chunks = []
-        for result in results:
-            chunks.append(RetrievedChunk(
-                text=result['text'],
-                score=result['score'],
-                metadata=result['metadata']
-            ))
-        
-        return QueryResponse(
-            success=True,
-            query=request.query,
-            chunks=chunks,
-            message=f"Retrieved {len(chunks)} relevant chunks"
+
+        filter_dict = {"filename": request.pdf_id} if request.pdf_id else None
+        results = await asyncio.to_thread(
+            pinecone_service.query,
+            query_embedding=query_embedding,
+            top_k=request.top_k,
+            filter_dict=filter_dict
         )
-        
+
+        for msg in history:
+            if msg.get('id') is not None:
+                msg['id'] = str(msg['id'])
+
+        return ORJSONResponse({
+            "chunks": [result['text'] for result in results],
+            "history": history
+        })
+
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error querying knowledge base: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error querying with context: {str(e)}")
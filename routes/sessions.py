@@ -1,7 +1,8 @@
 """
 Sessions routes for managing chat sessions.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from database.models import (
     Session,
     CreateSessionRequest,
@@ -10,22 +11,49 @@ from database.models import (
     ChatMessage
 )
 from database.db import get_database
+from pydantic import TypeAdapter
+from typing import List
+import asyncio
+import orjson
 import uuid
+from collections import deque
 
 router = APIRouter()
 
+# One adapter call in pydantic's Rust core replaces N per-row model
+# constructions when (de)serializing message lists
+_CHAT_MESSAGES_ADAPTER = TypeAdapter(List[ChatMessage])
+
+# Pre-generated session IDs: uuid4 hits the system RNG, so a background
+# task keeps a pool topped up off the request path
+_uuid_pool: deque = deque(maxlen=4096)
+
+
+async def refill_uuid_pool():
+    """Keep the session-ID pool topped up; started from lifespan."""
+    while True:
+        if len(_uuid_pool) < 2048:
+            _uuid_pool.extend(uuid.uuid4().hex for _ in range(2048))
+        await asyncio.sleep(1.0)
+
+# Serialized /sessions body, valid only while the database returns the
+# same cached listing object; any write invalidates the DB-level listing
+# cache, which transitively invalidates these bytes
+_listing_source = None
+_listing_body = None
+
 
 @router.post("/sessions", response_model=Session)
-async def create_session(request: CreateSessionRequest):
+async def create_session(request: CreateSessionRequest, db=Depends(get_database)):
     """Create a new chat session."""
     try:
-        db = get_database()
-        
-        # Generate unique session ID
-        session_id = str(uuid.uuid4())
+        # Generate unique session ID (pooled; fall back to a direct call
+        # if the refill task hasn't run yet)
+        session_id = _uuid_pool.popleft() if _uuid_pool else uuid.uuid4().hex
         
         # Create session in database
-        session_data = db.create_session(
+        session_data = await asyncio.to_thread(
+            db.create_session,
             session_id=session_id,
             name=request.name,
             mode=request.mode,
@@ -39,37 +67,45 @@ async def create_session(request: CreateSessionRequest):
 
 
 @router.get("/sessions", response_model=SessionsResponse)
-async def get_sessions():
+async def get_sessions(db=Depends(get_database)):
     """Get all chat sessions."""
+    global _listing_source, _listing_body
     try:
-        db = get_database()
-        sessions_data = db.get_all_sessions()
-        
-        sessions = [Session(**session) for session in sessions_data]
-        
-        return SessionsResponse(sessions=sessions)
+        sessions_data = await asyncio.to_thread(db.get_all_sessions)
+
+        # Sessions change only on writes: while the DB keeps handing back
+        # the same listing object, reuse the serialized bytes as-is
+        if sessions_data is not _listing_source or _listing_body is None:
+            _listing_source = sessions_data
+            _listing_body = orjson.dumps({"sessions": sessions_data})
+
+        return Response(content=_listing_body, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving sessions: {str(e)}")
 
 
 @router.get("/sessions/{session_id}/messages", response_model=MessagesResponse)
-async def get_session_messages(session_id: str):
+async def get_session_messages(session_id: str, db=Depends(get_database)):
     """Get all messages for a specific session."""
     try:
-        db = get_database()
-        
         # Check if session exists
-        session = db.get_session(session_id)
+        session = await asyncio.to_thread(db.get_session, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
         # Get messages for this session
-        messages_data = db.get_chat_history(session_id)
-        
-        messages = [ChatMessage(**msg) for msg in messages_data]
-        
-        return MessagesResponse(messages=messages)
+        messages_data = await asyncio.to_thread(db.get_chat_history, session_id)
+
+        # The model declares id as str while SQLite hands back an int
+        for msg in messages_data:
+            if msg.get('id') is not None:
+                msg['id'] = str(msg['id'])
+
+        messages = _CHAT_MESSAGES_ADAPTER.validate_python(messages_data)
+        return ORJSONResponse({
+            "messages": _CHAT_MESSAGES_ADAPTER.dump_python(messages, mode="json")
+        })
         
     except HTTPException:
         raise
@@ -78,18 +114,16 @@ async def get_session_messages(session_id: str):
 
 
 @router.delete("/sessions/{session_id}")
-async def delete_session(session_id: str):
+async def delete_session(session_id: str, db=Depends(get_database)):
     """Delete a session and all its messages."""
     try:
-        db = get_database()
-        
         # Check if session exists
-        session = db.get_session(session_id)
+        session = await asyncio.to_thread(db.get_session, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
         # Delete session and messages
-        db.delete_session_and_messages(session_id)
+        await asyncio.to_thread(db.delete_session_and_messages, session_id)
         
         return {
             "success": True,
@@ -3,9 +3,6 @@ Upload route for PDF file processing.
 """
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from database.models import PDFUploadResponse
-from services.pdf_processor import get_pdf_processor
-from services.embedding_service import get_embedding_service
-from services.pinecone_service import get_pinecone_service
 import config
 
 router = APIRouter()
@@ -30,55 +27,160 @@ async def upload_pdf(file: UploadFile = File(...)):
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail=f"Only PDF files are allowed. Got: {file.filename}")
     
-    # Check file size
-    file_content = await file.read()
-    if len(file_content) > config.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"File size ({len(file_content)} bytes) exceeds maximum allowed size of {config.MAX_FILE_SIZE} bytes"
-        )
-    
-    print(f"Processing PDF: {file.filename}, size: {len(file_content)} bytes")
-    
+    # Stream the body straight to disk in 1MB pieces: memory stays
+    # O(chunk) per request instead of O(filesize), and the size limit is
+    # enforced while reading rather than after buffering everything
+    import hashlib
+    import os
+
+    file_path = config.ensure_upload_dir() / file.filename
+    size = 0
+    # Hash while streaming: the chunk cache is keyed on content, and the
+    # bytes are already passing through
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, 'wb') as out:
+            while True:
+                piece = await file.read(1 << 20)
+                if not piece:
+                    break
+                size += len(piece)
+                digest.update(piece)
+                if size > config.MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File size exceeds maximum allowed size of {config.MAX_FILE_SIZE} bytes"
+                    )
+                out.write(piece)
+    except HTTPException:
+        if file_path.exists():
+            os.unlink(file_path)
+        raise
+
+    print(f"Processing PDF: {file.filename}, size: {size} bytes")
+
     try:
+        # Lazy imports keep pdfplumber and the Cohere/Pinecone SDKs out of
+        # the cold-start import chain
+        from services.pdf_processor import get_pdf_processor
+        from services.embedding_service import get_embedding_service
+        from services.pinecone_service import get_pinecone_service
+
         # Get services
         pdf_processor = get_pdf_processor()
         embedding_service = get_embedding_service()
         pinecone_service = get_pinecone_service()
         
-        # Save uploaded file
-        file_path = pdf_processor.save_uploaded_file(file_content, file.filename)
-        
-        # Process PDF (extract, clean, chunk)
-        chunks = pdf_processor.process_pdf(file_path, file.filename)
-        
-        if not chunks:
+        import asyncio
+
+        # Mirror to Appwrite Storage if configured (reads from disk, so
+        # the request body is never held in memory). The SDK call is
+        # blocking requests I/O, so it runs in a worker thread instead of
+        # stalling the event loop for the transfer
+        await asyncio.to_thread(
+            pdf_processor.mirror_to_appwrite, file_path, file.filename
+        )
+
+        # Pipeline the three I/O stages: while one batch is upserted to
+        # Pinecone the next is being embedded and a third extracted.
+        # Bounded queues provide backpressure; None is the end marker.
+
+        import numpy as np
+
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+        upsert_queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+        total_chunks = 0
+
+        # PDFs repeat boilerplate (headers, footers, title pages), and
+        # identical chunks embed to identical vectors; hash each chunk
+        # and only send first occurrences to Cohere, reusing the stored
+        # row for repeats. Hashing is free next to an embedding call.
+        seen_embeddings = {}
+
+        async def embedder():
+            while True:
+                batch = await embed_queue.get()
+                if batch is None:
+                    await upsert_queue.put(None)
+                    return
+
+                digests = [
+                    hashlib.blake2b(text.encode(), digest_size=16).digest()
+                    for text in batch.texts
+                ]
+                pending = {}
+                unique_texts = []
+                for digest, text in zip(digests, batch.texts):
+                    if digest not in seen_embeddings and digest not in pending:
+                        pending[digest] = len(unique_texts)
+                        unique_texts.append(text)
+
+                if unique_texts:
+                    new_rows = await embedding_service.generate_embeddings_batch(unique_texts)
+                    for digest, row in pending.items():
+                        seen_embeddings[digest] = new_rows[row]
+
+                # Scatter back to original positions: every chunk still
+                # gets its own vector (distinct ids/metadata), duplicates
+                # just share the embedding work
+                embeddings = np.stack([seen_embeddings[digest] for digest in digests])
+                await upsert_queue.put((embeddings, batch))
+
+        async def upserter():
+            while True:
+                item = await upsert_queue.get()
+                if item is None:
+                    return
+                embeddings, batch = item
+                # Metadata dicts are built only here, straight from the
+                # SoA batch (text included for retrieval)
+                metadata_list = [
+                    {
+                        'filename': batch.filename,
+                        'chunk_index': int(chunk_index),
+                        'total_chunks': batch.total,
+                        'source': 'pdf',
+                        'text': text
+                    }
+                    for text, chunk_index in zip(batch.texts, batch.indices)
+                ]
+                await asyncio.to_thread(
+                    pinecone_service.upsert_embeddings, embeddings, metadata_list
+                )
+
+        async def producer():
+            nonlocal total_chunks
+            async for batch in pdf_processor.stream_chunks(
+                file_path, file.filename, content_hash=digest.hexdigest()
+            ):
+                total_chunks += len(batch)
+                await embed_queue.put(batch)
+            await embed_queue.put(None)
+
+        # TaskGroup cancels the sibling stages when one raises; plain
+        # gather would leave the producer parked on a full bounded queue
+        # forever if the embedder or upserter died, leaking the task and
+        # its chunk batches
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(producer())
+                tg.create_task(embedder())
+                tg.create_task(upserter())
+        except ExceptionGroup as eg:
+            # Surface the stage's own error instead of the group wrapper
+            raise eg.exceptions[0]
+
+        if not total_chunks:
             raise HTTPException(status_code=400, detail="No text found in PDF. It might be scanned (image-only) or protected. Please use a text-based PDF.")
-        
-        # Extract text from chunks for embedding
-        chunk_texts = [chunk['text'] for chunk in chunks]
-        
-        # Generate embeddings for all chunks
-        embeddings = embedding_service.generate_embeddings_batch(chunk_texts)
-        
-        # Prepare metadata for Pinecone (include text in metadata)
-        metadata_list = []
-        for chunk in chunks:
-            metadata = chunk['metadata'].copy()
-            metadata['text'] = chunk['text']  # Store text in metadata for retrieval
-            metadata_list.append(metadata)
-        
-        # Upsert to Pinecone
-        pinecone_service.upsert_embeddings(embeddings, metadata_list)
-        
+
         # Return frontend-compatible format
         return {
             "success": True,
             "pdf_id": file.filename,
-            "number_of_chunks": len(chunks),
+            "number_of_chunks": total_chunks,
             "message": f"Successfully processed {file.filename}",
             "filename": file.filename,
-            "chunks_processed": len(chunks)
+            "chunks_processed": total_chunks
         }
 
         
@@ -7,7 +7,7 @@ from appwrite.services.databases import Databases
 from appwrite.id import ID
 from appwrite.input_file import InputFile
 import config
-import os
+from functools import lru_cache
 
 class AppwriteService:
     """Handles interactions with Appwrite."""
@@ -24,7 +24,15 @@ class AppwriteService:
         self._ensure_resources_exist()
     
     def _ensure_resources_exist(self):
-        """Ensure database, collections, and bucket exist."""
+        """Ensure database, collections, and bucket exist.
+
+        The full check fires a dozen blocking HTTP calls, so once it has
+        succeeded a marker file short-circuits every later cold start on
+        the same filesystem.
+        """
+        marker = config.APPWRITE_BOOTSTRAP_MARKER
+        if marker.exists():
+            return
         try:
             # 1. Check/Create Database
             try:
@@ -73,6 +81,12 @@ class AppwriteService:
                     antivirus=True
                 )
                 
+            # Only mark after a clean pass, so a partial bootstrap retries
+            try:
+                marker.write_text("ok")
+            except OSError as e:
+                print(f"Warning: could not write bootstrap marker {marker}: {e}")
+
         except Exception as e:
             print(f"Error initializing Appwrite resources: {e}")
 
@@ -126,26 +140,35 @@ class AppwriteService:
         Returns the file ID.
         """
         try:
-            # Create a temporary file to upload
-            # Appwrite SDK expects a file-like object or path
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False) as temp:
-                temp.write(file_content)
-                temp_path = temp.name
-            
+            # The bytes are already in memory; hand them to the SDK
+            # directly instead of round-tripping through a temp file
             result = self.storage.create_file(
                 bucket_id=config.APPWRITE_BUCKET_ID,
                 file_id=ID.unique(),
-                file=InputFile.from_path(temp_path, filename=filename)
+                file=InputFile.from_bytes(file_content, filename=filename)
             )
-            
-            os.unlink(temp_path) # Clean up temp file
             return result['$id']
         except Exception as e:
             print(f"Error uploading to Appwrite: {e}")
             # Fallback to local/tmp storage if Appwrite fails or not configured
             return None
 
+    def upload_file_from_path(self, file_path, filename: str) -> str:
+        """
+        Upload an on-disk file to Appwrite Storage without reading it
+        into memory first. Returns the file ID.
+        """
+        try:
+            result = self.storage.create_file(
+                bucket_id=config.APPWRITE_BUCKET_ID,
+                file_id=ID.unique(),
+                file=InputFile.from_path(str(file_path), filename=filename)
+            )
+            return result['$id']
+        except Exception as e:
+            print(f"Error uploading to Appwrite: {e}")
+            return None
+
     def save_chat_message(self, session_id: str, role: str, content: str):
         """Save a chat message to Appwrite Database."""
         try:
@@ -163,12 +186,8 @@ class AppwriteService:
         except Exception as e:
             print(f"Error saving message to Appwrite: {e}")
 
-# Singleton
-_appwrite_service = None
-
+@lru_cache(maxsize=1)
 def get_appwrite_service():
-    global _appwrite_service
-    if _appwrite_service is None:
-        if config.APPWRITE_PROJECT_ID and config.APPWRITE_API_KEY:
-            _appwrite_service = AppwriteService()
-    return _appwrite_service
+    if config.APPWRITE_PROJECT_ID and config.APPWRITE_API_KEY:
+        return AppwriteService()
+    return None
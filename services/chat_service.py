@@ -1,6 +1,8 @@
 """
 Chat service for managing chat history in SQLite.
 """
+from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from database.db import get_database
 from database.models import ChatMessage
@@ -32,23 +34,31 @@ class ChatService:
             True if successful
         """
         try:
-            # Save user question
-            self.db.save_message(
-                session_id=session_id,
-                message_type="user",
-                content=question,
-                metadata=None
-            )
-            
-            # Save assistant answer with retrieved chunks as metadata
             metadata = {"retrieved_chunks": retrieved_chunks} if retrieved_chunks else None
-            self.db.save_message(
-                session_id=session_id,
-                message_type="assistant",
-                content=answer,
-                metadata=metadata
-            )
-            
+
+            if hasattr(self.db, 'save_messages'):
+                # Batch question + answer into one transaction
+                # One transaction covers both messages and the session
+                # timestamp bump
+                self.db.save_messages([
+                    (session_id, "user", question, None),
+                    (session_id, "assistant", answer, metadata)
+                ], touch_session_id=session_id)
+            else:
+                # Appwrite backend has no batch API; save individually
+                self.db.save_message(
+                    session_id=session_id,
+                    message_type="user",
+                    content=question,
+                    metadata=None
+                )
+                self.db.save_message(
+                    session_id=session_id,
+                    message_type="assistant",
+                    content=answer,
+                    metadata=metadata
+                )
+
             return True
         except Exception as e:
             print(f"Error saving conversation: {str(e)}")
@@ -57,7 +67,8 @@ class ChatService:
     def get_history(
         self, 
         session_id: Optional[str] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        include_metadata: bool = False
     ) -> List[ChatMessage]:
         """
         Retrieve chat history.
@@ -65,18 +76,30 @@ class ChatService:
         Args:
             session_id: Optional session filter
             limit: Optional limit on number of messages
+            include_metadata: Also fetch and parse the retrieved-chunks
+                metadata payload (off the hot path by default)
             
         Returns:
             List of ChatMessage objects
         """
         try:
-            messages_data = self.db.get_chat_history(session_id, limit)
-            
-            # Convert to Pydantic models
+            messages_data = self.db.get_chat_history(session_id, limit,
+                                                     include_metadata)
+
+            # Rows come straight from the database with known-good types,
+            # so skip validation with model_construct; the timestamp is
+            # the one field that needs coercing (SQLite hands back a
+            # string, the model declares datetime) so responses keep the
+            # ISO-8601 wire format full validation produced
             messages = []
             for msg_data in messages_data:
-                messages.append(ChatMessage(**msg_data))
-            
+                if msg_data.get('id') is not None:
+                    msg_data['id'] = str(msg_data['id'])
+                timestamp = msg_data.get('timestamp')
+                if isinstance(timestamp, str):
+                    msg_data['timestamp'] = datetime.fromisoformat(timestamp)
+                messages.append(ChatMessage.model_construct(**msg_data))
+
             return messages
         except Exception as e:
             print(f"Error retrieving history: {str(e)}")
@@ -99,13 +122,7 @@ class ChatService:
             return 0
 
 
-# Singleton instance
-_chat_service = None
-
-
+@lru_cache(maxsize=1)
 def get_chat_service() -> ChatService:
     """Get or create the chat service singleton."""
-    global _chat_service
-    if _chat_service is None:
-        _chat_service = ChatService()
-    return _chat_service
+    return ChatService()
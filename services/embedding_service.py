@@ -1,77 +1,169 @@
 """
 Embedding service using Cohere API.
 """
+import asyncio
 import cohere
+import numpy as np
 import os
+from contextlib import suppress
+from functools import lru_cache
 from typing import List
 import config
 
 
+class _BatchingEmbedder:
+    """Coalesces concurrent single-text embed requests into one API call.
+
+    Under concurrent query load every handler would otherwise issue its
+    own 1-text Cohere call; network RTT dominates those, so within a
+    short window pending requests are collected and embedded together,
+    with results fanned back out through per-request futures.
+    """
+
+    _WINDOW_SECONDS = 0.02
+    _MAX_BATCH = 64
+
+    def __init__(self, embed_batch):
+        self._embed_batch = embed_batch
+        self._queue: "asyncio.Queue[tuple]" = asyncio.Queue()
+        self._pump_task = None
+
+    async def embed_one(self, text: str) -> List[float]:
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.get_running_loop().create_task(self._pump())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _pump(self):
+        while True:
+            batch = [await self._queue.get()]
+            with suppress(asyncio.TimeoutError):
+                while len(batch) < self._MAX_BATCH:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), self._WINDOW_SECONDS)
+                    )
+
+            try:
+                embeddings = await self._embed_batch([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            # Single-query callers feed JSON paths (cache, Pinecone query),
+            # so hand them plain lists rather than ndarray rows
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(
+                        embedding.tolist() if hasattr(embedding, 'tolist')
+                        else embedding
+                    )
+
+
 class EmbeddingService:
     """Generates embeddings using Cohere API."""
-    
+
     def __init__(self):
         self.api_key = os.getenv("COHERE_API_KEY")
         if not self.api_key:
             raise Exception("COHERE_API_KEY environment variable not set")
-        
-        self.client = cohere.Client(self.api_key)
+
+        # AsyncClient shares one keep-alive connection pool for the
+        # process lifetime and never blocks the event loop
+        self.client = cohere.AsyncClient(self.api_key)
         self.model = "embed-english-light-v3.0"  # 384 dimensions, free tier
+        self._batcher = _BatchingEmbedder(self.generate_embeddings_batch)
         print(f"Cohere embedding service initialized with model: {self.model}")
-    
-    def generate_embedding(self, text: str) -> List[float]:
+
+    async def warm(self):
+        """Prime the TLS connection and server-side path with one tiny
+        embed call, so the first real request skips the handshake cost.
+        Failures are logged, not raised; warmup is best-effort.
+        """
+        try:
+            await self.client.embed(
+                texts=["warmup"],
+                model=self.model,
+                input_type="search_document"
+            )
+        except Exception as e:
+            print(f"Embedding warmup failed: {e}")
+
+    async def generate_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for a single text using Cohere API.
-        
+
+        Concurrent callers within a ~20ms window share one batched API
+        call instead of each paying a full round trip.
+
         Args:
             text: Input text
-            
+
         Returns:
             Embedding vector as list of floats
         """
-        try:
-            response = self.client.embed(
-                texts=[text],
-                model=self.model,
-                input_type="search_document"
-            )
-            return response.embeddings[0]
-        except Exception as e:
-            raise Exception(f"Error generating embedding with Cohere: {str(e)}")
+        return await self._batcher.embed_one(text)
     
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    # Cohere caps embed requests at 96 texts; oversized batches are
+    # split and the sub-requests run concurrently
+    _MAX_EMBED_BATCH = 96
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for multiple texts in batch using Cohere API.
         More efficient than calling generate_embedding multiple times.
-        
+
         Args:
             texts: List of input texts
-            
+
         Returns:
-            List of embedding vectors
+            float32 ndarray of shape (len(texts), dimension); one
+            contiguous buffer instead of a list of lists of Python floats.
+            Rows are L2-normalized so the Pinecone index can use the
+            dot-product metric without server-side renormalization.
         """
         try:
-            response = self.client.embed(
-                texts=texts,
-                model=self.model,
-                input_type="search_document"
-            )
-            return response.embeddings
+            if len(texts) <= self._MAX_EMBED_BATCH:
+                response = await self.client.embed(
+                    texts=texts,
+                    model=self.model,
+                    input_type="search_document"
+                )
+                embeddings = np.asarray(response.embeddings, dtype=np.float32)
+            else:
+                responses = await asyncio.gather(*(
+                    self.client.embed(
+                        texts=texts[start:start + self._MAX_EMBED_BATCH],
+                        model=self.model,
+                        input_type="search_document"
+                    )
+                    for start in range(0, len(texts), self._MAX_EMBED_BATCH)
+                ))
+                embeddings = np.concatenate([
+                    np.asarray(response.embeddings, dtype=np.float32)
+                    for response in responses
+                ])
+            return self._normalize(embeddings)
         except Exception as e:
             raise Exception(f"Error generating embeddings with Cohere: {str(e)}")
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        """L2-normalize rows in place; zero vectors are left untouched."""
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        np.maximum(norms, 1e-12, out=norms)
+        embeddings /= norms
+        return embeddings
     
     def get_embedding_dimension(self) -> int:
         """Get the dimension of the embeddings."""
         return config.EMBEDDING_DIMENSION
 
 
-# Singleton instance
-_embedding_service = None
-
-
+@lru_cache(maxsize=1)
 def get_embedding_service() -> EmbeddingService:
     """Get or create the embedding service singleton."""
-    global _embedding_service
-    if _embedding_service is None:
-        _embedding_service = EmbeddingService()
-    return _embedding_service
+    return EmbeddingService()
@@ -3,7 +3,9 @@ Pinecone service for vector storage and retrieval.
 """
 from pinecone import Pinecone, ServerlessSpec
 from typing import List, Dict, Any
+from functools import lru_cache
 import config
+import hashlib
 import uuid
 
 
@@ -32,10 +34,16 @@ class PineconeService:
             
             if self.index_name not in existing_indexes:
                 print(f"Creating new Pinecone index: {self.index_name}")
+                # Embeddings arrive unit-normalized from EmbeddingService,
+                # so dot product == cosine here minus the per-query
+                # normalization Pinecone would otherwise do server-side.
+                # Only applies to newly created indexes; an existing
+                # cosine index keeps working (cosine of unit vectors is
+                # the same ranking).
                 self.pc.create_index(
                     name=self.index_name,
                     dimension=self.dimension,
-                    metric="cosine",
+                    metric="dotproduct",
                     spec=ServerlessSpec(
                         cloud="aws",
                         region="us-east-1"
@@ -51,17 +59,18 @@ class PineconeService:
             raise Exception(f"Error initializing Pinecone: {str(e)}")
     
     def upsert_embeddings(
-        self, 
-        embeddings: List[List[float]], 
+        self,
+        embeddings,
         metadata_list: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """
         Upsert embeddings with metadata to Pinecone.
-        
+
         Args:
-            embeddings: List of embedding vectors
+            embeddings: Embedding vectors; a float32 ndarray stays an
+                ndarray until each row is serialized for its vector dict
             metadata_list: List of metadata dicts (one per embedding)
-            
+
         Returns:
             Upsert response from Pinecone
         """
@@ -69,22 +78,38 @@ class PineconeService:
             raise ValueError("Number of embeddings must match number of metadata entries")
         
         try:
-            # Create vectors with unique IDs
+            # Deterministic IDs from (filename, chunk_index): re-upserting
+            # the same document overwrites its vectors in place instead of
+            # accumulating random-ID duplicates, and blake2b beats a
+            # urandom read per vector
             vectors = []
             for i, (embedding, metadata) in enumerate(zip(embeddings, metadata_list)):
-                vector_id = str(uuid.uuid4())
+                if 'filename' in metadata and 'chunk_index' in metadata:
+                    key = f"{metadata['filename']}:{metadata['chunk_index']}"
+                    vector_id = hashlib.blake2b(
+                        key.encode(), digest_size=16
+                    ).hexdigest()
+                else:
+                    vector_id = uuid.uuid4().hex
                 vectors.append({
                     'id': vector_id,
-                    'values': embedding,
+                    'values': embedding.tolist() if hasattr(embedding, 'tolist') else embedding,
                     'metadata': metadata
                 })
-            
-            # Upsert to Pinecone
-            response = self.index.upsert(vectors=vectors)
-            
+
+            # Upsert in Pinecone's recommended 100-vector batches; with
+            # async_req the requests overlap on the wire and the futures
+            # are collected at the end
+            futures = [
+                self.index.upsert(vectors=vectors[start:start + 100],
+                                  async_req=True)
+                for start in range(0, len(vectors), 100)
+            ]
+            responses = [future.get() for future in futures]
+
             print(f"Upserted {len(vectors)} vectors to Pinecone")
-            return response
-            
+            return responses[-1] if responses else None
+
         except Exception as e:
             raise Exception(f"Error upserting to Pinecone: {str(e)}")
     
@@ -145,13 +170,7 @@ class PineconeService:
             raise Exception(f"Error getting index stats: {str(e)}")
 
 
-# Singleton instance
-_pinecone_service = None
-
-
+@lru_cache(maxsize=1)
 def get_pinecone_service() -> PineconeService:
     """Get or create the Pinecone service singleton."""
-    global _pinecone_service
-    if _pinecone_service is None:
-        _pinecone_service = PineconeService()
-    return _pinecone_service
+    return PineconeService()
@@ -0,0 +1,253 @@
+"""
+In-process semantic cache for query embeddings and retrieval results.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+import config
+
+
+_SQL_CREATE_SPILL = """
+    CREATE TABLE IF NOT EXISTS sem_cache (
+        query TEXT NOT NULL,
+        emb BLOB NOT NULL,
+        results BLOB NOT NULL,
+        pdf_id TEXT,
+        ts INTEGER NOT NULL
+    )
+"""
+
+_SQL_INSERT_SPILL = """
+    INSERT INTO sem_cache (query, emb, results, pdf_id, ts)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_SQL_SELECT_RECENT = """
+    SELECT query, emb, results, pdf_id, ts FROM sem_cache
+    WHERE ts > ?
+    ORDER BY ts DESC
+    LIMIT ?
+"""
+
+_SQL_PRUNE_EXPIRED = "DELETE FROM sem_cache WHERE ts <= ?"
+
+
+class _Namespace:
+    """Cache state for one pdf_id namespace (None = unfiltered queries)."""
+
+    def __init__(self, capacity: int, dimension: int):
+        self.capacity = capacity
+        # Exact-string layer: sha1(query) -> (embedding, results, timestamp)
+        self.exact: "OrderedDict[str, tuple]" = OrderedDict()
+        # Semantic layer: ring buffer of normalized embeddings plus the
+        # parallel entry list; one numpy dot scores all rows at once
+        self.matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        self.entries: List[Optional[tuple]] = [None] * capacity
+        self.size = 0
+        self.head = 0
+
+
+class SemanticCache:
+    """Two-layer cache: exact-string hits, then cosine similarity over
+    recent query embeddings.
+
+    A hit skips both the Cohere embed round-trip and the Pinecone query.
+    Entries are namespaced per pdf_id so filtered retrievals never leak
+    across documents, and expire after a TTL.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        threshold: float = 0.97,
+        ttl_seconds: float = 3600.0,
+        dimension: int = None
+    ):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.dimension = dimension or config.EMBEDDING_DIMENSION
+        self._namespaces: Dict[Optional[str], _Namespace] = {}
+        # Spill new entries to SQLite so restarted workers start warm;
+        # scoring still happens against the in-RAM matrix only
+        self._spill_lock = threading.Lock()
+        try:
+            self._spill = sqlite3.connect(
+                config.SEMANTIC_CACHE_PATH, check_same_thread=False
+            )
+            self._spill.execute(_SQL_CREATE_SPILL)
+            self._spill.execute("PRAGMA journal_mode=WAL")
+            self._spill.execute("PRAGMA synchronous=OFF")
+            self._spill.commit()
+        except sqlite3.Error as e:
+            print(f"Semantic cache persistence disabled: {e}")
+            self._spill = None
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return hashlib.sha1(query.encode()).hexdigest()
+
+    def _namespace(self, pdf_id: Optional[str]) -> _Namespace:
+        ns = self._namespaces.get(pdf_id)
+        if ns is None:
+            ns = _Namespace(self.capacity, self.dimension)
+            self._namespaces[pdf_id] = ns
+        return ns
+
+    def lookup(
+        self,
+        query: str,
+        top_k: int,
+        pdf_id: Optional[str] = None
+    ) -> Optional[Tuple[List[float], List[Dict[str, Any]]]]:
+        """Return (embedding, results) on a hit, or None.
+
+        Exact-string matches are checked first; otherwise the query must
+        already be embedded, so only put() can feed the semantic layer --
+        semantic hits happen via lookup_by_embedding.
+        """
+        ns = self._namespaces.get(pdf_id)
+        if ns is None:
+            return None
+
+        hit = ns.exact.get(self._key(query))
+        if hit is None:
+            return None
+
+        embedding, results, ts = hit
+        if time.monotonic() - ts > self.ttl_seconds or len(results) < top_k:
+            return None
+
+        ns.exact.move_to_end(self._key(query))
+        return embedding, results[:top_k]
+
+    def lookup_by_embedding(
+        self,
+        embedding: List[float],
+        top_k: int,
+        pdf_id: Optional[str] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Find cached results for a near-duplicate query embedding."""
+        ns = self._namespaces.get(pdf_id)
+        if ns is None or ns.size == 0:
+            return None
+
+        q = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm == 0:
+            return None
+        q /= norm
+
+        scores = ns.matrix[:ns.size] @ q
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        entry = ns.entries[best]
+        if entry is None:
+            return None
+        _, results, ts = entry
+        if time.monotonic() - ts > self.ttl_seconds or len(results) < top_k:
+            return None
+
+        return results[:top_k]
+
+    def put(
+        self,
+        query: str,
+        embedding: List[float],
+        results: List[Dict[str, Any]],
+        pdf_id: Optional[str] = None
+    ):
+        """Insert a freshly computed (query, embedding, results) triple."""
+        now = time.monotonic()
+        self._insert(query, embedding, results, pdf_id, now)
+
+        if self._spill is not None:
+            try:
+                with self._spill_lock:
+                    self._spill.execute(_SQL_INSERT_SPILL, (
+                        query,
+                        np.asarray(embedding, dtype=np.float32).tobytes(),
+                        orjson.dumps(results),
+                        pdf_id,
+                        int(time.time())
+                    ))
+                    self._spill.commit()
+            except sqlite3.Error as e:
+                print(f"Semantic cache spill failed: {e}")
+
+    def load_persisted(self, limit: int = 1000) -> int:
+        """Warm the in-RAM layers from the spill table after a restart.
+
+        Expired rows are pruned first; the remaining newest rows are
+        replayed oldest-first so eviction keeps the most recent entries.
+        Returns the number of entries loaded.
+        """
+        if self._spill is None:
+            return 0
+
+        cutoff = int(time.time() - self.ttl_seconds)
+        try:
+            with self._spill_lock:
+                self._spill.execute(_SQL_PRUNE_EXPIRED, (cutoff,))
+                self._spill.commit()
+                rows = self._spill.execute(
+                    _SQL_SELECT_RECENT, (cutoff, limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Semantic cache warm load failed: {e}")
+            return 0
+
+        wall_now = time.time()
+        mono_now = time.monotonic()
+        for query, emb, results, pdf_id, ts in reversed(rows):
+            # Persisted timestamps are wall-clock; translate the age onto
+            # the monotonic scale the TTL checks use
+            self._insert(
+                query,
+                np.frombuffer(emb, dtype=np.float32).tolist(),
+                orjson.loads(results),
+                pdf_id,
+                mono_now - (wall_now - ts)
+            )
+        return len(rows)
+
+    def _insert(
+        self,
+        query: str,
+        embedding: List[float],
+        results: List[Dict[str, Any]],
+        pdf_id: Optional[str],
+        now: float
+    ):
+        """Insert into the exact and semantic in-RAM layers."""
+        ns = self._namespace(pdf_id)
+
+        ns.exact[self._key(query)] = (embedding, results, now)
+        ns.exact.move_to_end(self._key(query))
+        while len(ns.exact) > self.capacity:
+            ns.exact.popitem(last=False)
+
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            slot = ns.head
+            ns.matrix[slot] = vec / norm
+            ns.entries[slot] = (embedding, results, now)
+            ns.head = (slot + 1) % self.capacity
+            ns.size = min(ns.size + 1, self.capacity)
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    """Get the process-wide semantic cache singleton."""
+    return SemanticCache()
@@ -1,2 +1,2 @@
 #!/bin/bash
-python -m uvicorn main:app --host 0.0.0.0 --port 8000
+python -m uvicorn main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --no-access-log